@@ -10,13 +10,20 @@ Features:
 - Cron support: Schedule regular market analysis
 """
 
-import traceback
 import asyncio
+import functools
+import hashlib
+import reprlib
+import signal
 import json
+import logging
+import logging.handlers
+import math
 import time
 import uuid
 import os
 import sys
+import threading
 from typing import Any, Dict, Optional, List
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor
@@ -25,48 +32,218 @@ import websockets
 from strands import Agent, tool
 
 # Import tools
-from .tools.history import history
-from .tools.use_ccxt import use_ccxt
+from .tools.history import history, _tail as _history_tail
+from .tools.use_ccxt import use_ccxt, _exchange_key, _warm_exchange
 from .tools.interface import interface
 
+# Tool set handed to every agent in a single registration
+TRADING_TOOLS = [use_ccxt, history, interface]
+
 # Try to import ccxt for direct UI operations
 try:
     import ccxt
-
-    _ccxt_cache = {}  # Cache exchange instances
 except ImportError:
     ccxt = None
-    _ccxt_cache = {}
+
+# UI exchange instances, kept apart from use_ccxt's cache: keyed only by the
+# connecting client's own credentials, so a dashboard never gets the env
+# credentials or CCXT_SANDBOX instance that the agent tool builds
+_ccxt_cache: Dict[str, Any] = {}
+_ccxt_lock = threading.Lock()  # built from executor threads
+
+# Optional faster JSON encoder for the WebSocket stream
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional faster event loop (libuv) for the WebSocket server
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# json.dumps(..., ensure_ascii=False) builds a new JSONEncoder per call;
+# the stream encodes on every chunk, so keep one encoder's bound method
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
 
 # Environment config
 os.environ["BYPASS_TOOL_CONSENT"] = "true"
 
+logger = logging.getLogger("hashtrade")
+
+# Log records are buffered and written in batches (see main()); flushed at
+# turn end, at least every LOG_FLUSH_INTERVAL seconds (see amain()), and
+# immediately for warnings and errors
+LOG_BUFFER_CAPACITY = 64
+LOG_FLUSH_INTERVAL = 2
+_log_buffer: Optional[logging.handlers.MemoryHandler] = None
+
+
+def _flush_logs() -> None:
+    if _log_buffer is not None:
+        _log_buffer.flush()
+
+
+# Project root (resolved once - clients chdir here on connect)
+PROJ_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
 # Global thread pool - reuse across turns for performance
 _executor = ThreadPoolExecutor(max_workers=4)
 
 
+# ============================================================================
+# Server Configuration
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Server settings parsed and validated once from DASH_* env vars."""
+
+    host: str = "0.0.0.0"
+    port: int = 8090
+    exchange: str = "bybit"
+    auto_trigger: bool = True
+    symbols: tuple = ("BTC/USDT", "ETH/USDT")
+    custom_prompt: str = ""
+    custom_prompt_file: str = ""
+    idle_move_pct: float = 0.0  # 0 disables idle-wake skipping
+    cpu_affinity: tuple = ()  # CPU ids to pin the process to (empty = no pinning)
+    quiet_hours: frozenset = frozenset()  # UTC hours with no autonomous wakes
+    log_level: str = "INFO"
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        port_raw = os.getenv("DASH_PORT", "8090")
+        try:
+            port = int(port_raw)
+        except ValueError:
+            raise ValueError(f"DASH_PORT must be an integer, got {port_raw!r}") from None
+        if not 0 < port < 65536:
+            raise ValueError(f"DASH_PORT out of range: {port}")
+
+        symbols = tuple(
+            s.strip()
+            for s in os.getenv("DASH_SYMBOLS", "BTC/USDT,ETH/USDT").split(",")
+            if s.strip()
+        )
+        if not symbols:
+            raise ValueError("DASH_SYMBOLS must list at least one symbol")
+
+        idle_raw = os.getenv("DASH_IDLE_MOVE_PCT", "0")
+        try:
+            idle_move_pct = float(idle_raw)
+        except ValueError:
+            raise ValueError(
+                f"DASH_IDLE_MOVE_PCT must be a number, got {idle_raw!r}"
+            ) from None
+
+        # "2" / "2,3" / "2-3"
+        affinity_raw = os.getenv("DASH_CPU_AFFINITY", "").strip()
+        cpus = set()
+        try:
+            for part in filter(None, (p.strip() for p in affinity_raw.split(","))):
+                lo, sep, hi = part.partition("-")
+                lo, hi = int(lo), int(hi if sep else lo)  # "2-" is an error
+                if hi < lo:  # reversed range like "2-1"
+                    raise ValueError
+                cpus.update(range(lo, hi + 1))
+            if affinity_raw and not cpus:  # e.g. ","
+                raise ValueError
+        except ValueError:
+            raise ValueError(
+                f"DASH_CPU_AFFINITY must list CPU ids like '2,3' or '2-3', "
+                f"got {affinity_raw!r}"
+            ) from None
+
+        # UTC hours, "2-5" / "22-1,13" (ranges inclusive, may wrap midnight)
+        quiet_raw = os.getenv("DASH_QUIET_HOURS", "").strip()
+        quiet = set()
+        try:
+            for part in filter(None, (p.strip() for p in quiet_raw.split(","))):
+                lo, sep, hi = part.partition("-")
+                lo, hi = int(lo), int(hi if sep else lo)  # "5-" is an error
+                if not (0 <= lo < 24 and 0 <= hi < 24):
+                    raise ValueError
+                if hi < lo:  # wraps midnight
+                    hi += 24
+                quiet.update(h % 24 for h in range(lo, hi + 1))
+        except ValueError:
+            raise ValueError(
+                f"DASH_QUIET_HOURS must list UTC hours 0-23 like '2-5' or '22-1,13', "
+                f"got {quiet_raw!r}"
+            ) from None
+
+        log_level = os.getenv("DASH_LOG_LEVEL", "INFO").strip().upper()
+        if not isinstance(logging.getLevelName(log_level), int):
+            raise ValueError(f"DASH_LOG_LEVEL is not a logging level: {log_level!r}")
+
+        return cls(
+            host=os.getenv("DASH_HOST", "0.0.0.0"),
+            port=port,
+            exchange=os.getenv("DASH_EXCHANGE", "bybit"),
+            auto_trigger=os.getenv("DASH_AUTO_TRIGGER", "true").lower() == "true",
+            symbols=symbols,
+            custom_prompt=os.getenv("DASH_CUSTOM_PROMPT", ""),
+            custom_prompt_file=os.getenv("DASH_CUSTOM_PROMPT_FILE", ""),
+            idle_move_pct=max(0.0, idle_move_pct),
+            cpu_affinity=tuple(sorted(cpus)),
+            quiet_hours=frozenset(quiet),
+            log_level=log_level,
+        )
+
+
+SERVER_CONFIG = ServerConfig.from_env()
+
+
 # ============================================================================
 # Auto-Trigger Configuration
 # ============================================================================
 
 # Snooze intervals in seconds (5, 10, 20, 25 minutes - then repeats)
 SNOOZE_INTERVALS = [5 * 60, 10 * 60, 20 * 60, 25 * 60]
+SNOOZE_PATTERN_MINS = [s // 60 for s in SNOOZE_INTERVALS]
+
+# Scheduled wakes snap to 5m candle closes (+ a little lag for the exchange
+# to publish the bar), so the agent always reads a freshly closed candle
+WAKE_ALIGN_SECS = 5 * 60
+WAKE_ALIGN_LAG = 2
+
+# How often the auto-trigger loop pushes a status update to the client
+STATUS_INTERVAL = 10
+
+# Minimum gap between the end of an autonomous turn and the next wake
+MIN_WAKE_GAP = 60
 
-# Autonomous agent prompt - agent decides its own goals AND executes trades
-AUTONOMOUS_PROMPT = """[AUTONOMOUS MODE - Wake #{count}]
+# Never skip more than this many quiet wakes in a row (DASH_IDLE_MOVE_PCT)
+IDLE_MAX_SKIPS = 3
+
+# Max distinct history lines injected into the system prompt
+HISTORY_CONTEXT_LINES = 10
+
+# Seconds a UI chart fetch is served from memory (reopening the chart, or
+# several tabs on one symbol, shouldn't each refetch the candles)
+OHLCV_CACHE_TTL = 10
+
+# History event types rendered as trades in the prompt context
+TRADE_EVENT_TYPES = frozenset({"order", "trade", "buy", "sell"})
+
+# Autonomous agent prompt - agent decides its own goals AND executes trades.
+# Kept free of per-wake values so it is byte-identical across wakes and the
+# model provider can serve it from its prompt-prefix cache.
+AUTONOMOUS_PROMPT = """[AUTONOMOUS MODE]
 
 You are running autonomously with FULL TRADING AUTHORITY.
 
 ## Your Process:
 1. Check history(action="tail", limit=30) - review your memory and open positions
-2. Fetch current prices for watched symbols
+2. Review the market snapshot below (prices are already fetched for you)
 3. Analyze: Compare to your previous notes, spot opportunities
 4. DECIDE: Hold, Buy, Sell, or adjust positions
 5. EXECUTE: If you see a good trade, TAKE IT with use_ccxt
 6. Log everything to history for continuity
 
-## Watched Symbols: {symbols}
-
 ## Trading Authority:
 - You CAN and SHOULD execute trades when you see opportunity
 - Use use_ccxt(action="create_order") to buy/sell
@@ -95,7 +272,7 @@ You are running autonomously with FULL TRADING AUTHORITY.
 
 ## Example Flow:
 1. history(tail) → See: "Watching BTC $67,000 support"
-2. use_ccxt(fetch_ticker, BTC/USDT) → Price: $67,050
+2. Market snapshot → BTC/USDT last $67,050
 3. Think: "Bouncing off support, volume picking up"
 4. history(add, note) → "Going long BTC, support holding"
 5. use_ccxt(create_order, buy, 0.001, BTC/USDT) → EXECUTE
@@ -103,6 +280,115 @@ You are running autonomously with FULL TRADING AUTHORITY.
 
 Now wake up, check your memory, analyze the market, and TRADE if you see opportunity."""
 
+# Per-wake context - always appended after AUTONOMOUS_PROMPT, never interpolated into it
+AUTONOMOUS_CONTEXT = """
+
+## Wake #{count}
+
+## Watched Symbols: {symbols}
+
+## Market Snapshot (prefetched):
+{snapshot}"""
+
+
+# Base system prompt for every trading agent
+SYSTEM_PROMPT = """You are an AUTONOMOUS cryptocurrency trading agent with FULL TRADING AUTHORITY.
+
+## Core Identity:
+You are not an assistant - you are an autonomous trading agent that:
+- Monitors markets and EXECUTES trades independently
+- Remembers everything through history (your memory)
+- Makes trading decisions based on analysis
+- Manages positions over time
+- Operates like a professional trader 24/7
+
+## Your Memory System (CRITICAL):
+The `history` tool is your persistent memory:
+- **Read**: history(action="tail", limit=30) - Review recent notes/trades
+- **Note**: history(action="add", type="note", data={"message": "..."})
+- **Signal**: history(action="add", type="signal", data={"symbol": "...", "action": "buy/sell"})
+- **Trade**: history(action="add", type="trade", data={"symbol": "...", "side": "buy", "amount": ..., "price": ...})
+
+## Tools:
+1. **use_ccxt** - TRADING & DATA
+   - fetch_ticker: Get current price
+   - fetch_ohlcv: Get candles for analysis
+   - multi_ohlcv: Candles for several symbols in one call (symbols='["BTC/USDT", ...]')
+   - fetch_balance: Check your funds
+   - create_order: EXECUTE BUY/SELL orders
+   - create_orders: Several orders in one request (orders='[{...}, {...}]')
+     Check "failed" in the result: those legs (indexes into orders) were NOT placed
+   - cancel_order: Cancel open orders
+   
+2. **history** - YOUR MEMORY (use it!)
+   
+3. **interface** - Dashboard UI
+
+## Trading Authority:
+YOU ARE AUTHORIZED TO:
+- Execute market and limit orders
+- Buy and sell any watched symbol
+- Scale in and out of positions
+- Manage your own risk
+
+## Trading Rules:
+- Always check balance before trading
+- Start small ($10-50 per trade)
+- Log reasoning BEFORE executing
+- Log fill details AFTER executing
+- Track P&L in your notes
+- Never risk more than 10% on one trade
+
+## Decision Framework:
+- **BUY**: Support holds, oversold, momentum reversal
+- **SELL**: Resistance hit, overbought, momentum fading
+- **HOLD**: Unclear setup, wait for confirmation
+- **EXIT**: Hit target, stop-loss, thesis broken
+
+## Example Trade Flow:
+```
+1. history(tail) → Check memory
+2. use_ccxt(fetch_balance) → Have 100 USDT
+3. use_ccxt(fetch_ticker, BTC/USDT) → $67,050
+4. Analyze: "Support at $67k holding, RSI oversold"
+5. history(add, note) → "Going long BTC - support bounce"
+6. use_ccxt(create_order, buy, market, BTC/USDT, 0.0007) → BUY!
+7. history(add, trade) → Log entry
+```
+
+## Important:
+- You MAKE the trading decisions
+- Log everything to history
+- Be disciplined - follow your rules
+- Learn from past trades in your memory
+"""
+
+CUSTOM_INSTRUCTIONS = "\n\n## Custom Instructions:\n{}\n"
+
+# DASH_CUSTOM_PROMPT is fixed for the process, so fold it in once here;
+# only the prompt file, client prompt and history vary per agent
+BASE_SYSTEM_PROMPT = SYSTEM_PROMPT + (
+    CUSTOM_INSTRUCTIONS.format(SERVER_CONFIG.custom_prompt)
+    if SERVER_CONFIG.custom_prompt
+    else ""
+)
+
+
+def _align_to_candle(deadline: float, earliest: float) -> float:
+    """Push a monotonic deadline to the first WAKE_ALIGN_SECS candle close at
+    or after it, so a snooze never fires early.
+
+    Closes are wall-clock boundaries, so the offset is computed against
+    time.time(); the result stays on the monotonic clock and is never
+    before `earliest`.
+    """
+    offset = time.time() - time.monotonic()
+    wall = deadline + offset
+    aligned = math.ceil(wall / WAKE_ALIGN_SECS) * WAKE_ALIGN_SECS + WAKE_ALIGN_LAG
+    while aligned - offset < earliest:
+        aligned += WAKE_ALIGN_SECS
+    return aligned - offset
+
 
 @dataclass
 class AutoTriggerState:
@@ -111,55 +397,116 @@ class AutoTriggerState:
     enabled: bool = True
     last_interaction: float = field(default_factory=time.time)
     snooze_index: int = 0  # Current position in SNOOZE_INTERVALS
+    # next_trigger/paused_until are time.monotonic() deadlines so wall-clock
+    # steps (NTP, suspend/resume) can't fire or stall a wake
     next_trigger: float = 0
     trigger_count: int = 0
     paused_until: float = 0  # Manual pause
     symbols: List[str] = field(default_factory=lambda: ["BTC/USDT", "ETH/USDT"])
+    wake_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    last_prices: Dict[str, float] = field(default_factory=dict)  # at last wake
+    idle_skips: int = 0  # Consecutive wakes skipped for a quiet market
+    symbols_str: str = field(default="", repr=False)  # ", ".join(symbols)
+
+    def __post_init__(self) -> None:
+        self.symbols_str = ", ".join(self.symbols)
+
+    def set_symbols(self, symbols: Any) -> None:
+        """Replace the watch list from a list or comma-separated string.
+
+        Entries are stripped and de-duplicated; an empty result is ignored.
+        """
+        if isinstance(symbols, str):
+            symbols = symbols.split(",")
+        cleaned = list(dict.fromkeys(str(s).strip() for s in symbols or []))
+        cleaned = [s for s in cleaned if s]
+        if not cleaned:
+            return
+        self.symbols = cleaned
+        self.symbols_str = ", ".join(cleaned)
+        self.last_prices = {}
 
     def get_next_interval(self) -> int:
         """Get next snooze interval, cycling through the pattern."""
         interval = SNOOZE_INTERVALS[self.snooze_index % len(SNOOZE_INTERVALS)]
         return interval
 
-    def advance_snooze(self):
+    def advance_snooze(self) -> None:
         """Move to next snooze interval."""
         self.snooze_index += 1
         self.trigger_count += 1
 
-    def reset_snooze(self):
+    def reset_snooze(self) -> None:
         """Reset snooze back to first interval (user interacted)."""
         self.snooze_index = 0
         self.last_interaction = time.time()
 
-    def schedule_next(self):
-        """Schedule the next auto-trigger."""
+    def schedule_next(self, started: Optional[float] = None) -> int:
+        """Schedule the next auto-trigger.
+
+        With `started` (when the finished wake began), the interval is
+        measured from the wake's start so turn time doesn't stretch the
+        period, but never closer than MIN_WAKE_GAP from now.
+        """
         interval = self.get_next_interval()
-        self.next_trigger = time.time() + interval
+        now = time.monotonic()
+        if started is None:
+            target = now + interval
+        else:
+            target = max(started + interval, now + MIN_WAKE_GAP)
+        self.next_trigger = _align_to_candle(target, now + MIN_WAKE_GAP)
         return interval
 
     def should_trigger(self) -> bool:
         """Check if we should auto-trigger now."""
         if not self.enabled:
             return False
-        if time.time() < self.paused_until:
+        now = time.monotonic()
+        if now < self.paused_until:
             return False
         if self.next_trigger == 0:
             return False
-        return time.time() >= self.next_trigger
+        return now >= self.next_trigger
+
+    def seconds_until_trigger(self) -> float:
+        """Seconds until the next trigger can fire (inf if none is scheduled)."""
+        if not self.enabled or self.next_trigger == 0:
+            return float("inf")
+        return max(0.0, max(self.next_trigger, self.paused_until) - time.monotonic())
+
+    def wake(self) -> None:
+        """Wake the auto-trigger loop so a state change applies immediately."""
+        self.wake_event.set()
+
+    def market_moved(self, prices: Dict[str, float], threshold_pct: float) -> bool:
+        """Whether any watched price moved >= threshold_pct since the last wake."""
+        if threshold_pct <= 0 or self.idle_skips >= IDLE_MAX_SKIPS:
+            return True
+        threshold = threshold_pct / 100  # compare |move| >= prev * fraction
+        for symbol in self.symbols:
+            prev = self.last_prices.get(symbol)
+            last = prices.get(symbol)
+            if not prev or last is None:
+                return True
+            if abs(last - prev) >= abs(prev) * threshold:
+                return True
+        return False
 
     def get_status(self) -> dict:
         """Get current status for UI."""
-        now = time.time()
+        now = time.monotonic()
         time_until_next = max(0, self.next_trigger - now) if self.next_trigger > 0 else 0
+        paused = now < self.paused_until
         return {
             "enabled": self.enabled,
             "snooze_index": self.snooze_index,
-            "snooze_pattern": [s // 60 for s in SNOOZE_INTERVALS],  # in minutes
+            "snooze_pattern": SNOOZE_PATTERN_MINS,
             "current_interval_mins": self.get_next_interval() // 60,
             "next_trigger_in_secs": int(time_until_next),
             "trigger_count": self.trigger_count,
-            "paused": now < self.paused_until,
-            "paused_until": self.paused_until if now < self.paused_until else 0,
+            "paused": paused,
+            # wall-clock epoch for the UI
+            "paused_until": time.time() + (self.paused_until - now) if paused else 0,
             "symbols": self.symbols,
         }
 
@@ -188,7 +535,21 @@ class StreamMsg:
         }
         if self.meta:
             payload.update(self.meta)
-        return json.dumps(payload, ensure_ascii=False)
+        if orjson is not None:
+            try:
+                return orjson.dumps(payload).decode("utf-8")
+            except TypeError:
+                pass  # non-str keys or types orjson can't encode
+        return _json_encode(payload)
+
+
+async def _safe_send(websocket, msg: StreamMsg) -> bool:
+    """Best-effort send; returns False instead of raising if it failed."""
+    try:
+        await websocket.send(msg.dumps())
+        return True
+    except Exception:
+        return False
 
 
 # ============================================================================
@@ -196,10 +557,29 @@ class StreamMsg:
 # ============================================================================
 
 
+def _result_texts(tool_result: Dict[str, Any]) -> List[str]:
+    """Text parts of a tool result's content list (non-dict parts via str())."""
+    try:
+        content = tool_result["content"]
+    except (KeyError, TypeError):
+        return []
+    texts = []
+    for rc in content:
+        if isinstance(rc, dict):
+            text = rc.get("text")
+            if text:
+                texts.append(text)
+        else:
+            texts.append(str(rc))
+    return texts
+
+
 class WSCallback:
     """Strands callback handler that streams to WebSocket in real-time."""
 
-    def __init__(self, websocket, loop, turn_id: str, is_auto: bool = False):
+    def __init__(
+        self, websocket, loop, turn_id: str, is_auto: bool = False
+    ) -> None:
         self.ws = websocket
         self.loop = loop
         self.turn_id = turn_id
@@ -208,39 +588,88 @@ class WSCallback:
         self.previous_tool_use = None
         self.actions: list[dict] = []
         self._closed = False
-        self._pending: list = []  # Buffer for batching
+        # Open batch of text chunks not yet sent. The agent thread appends;
+        # the loop swaps it out and sends the batch as one message.
+        self._pending: list = []
+        self._pending_lock = threading.Lock()
+
+        # Text chunks are the bulk of the stream and differ only in text and
+        # timestamp, so encode the fixed part of the envelope once per turn
+        # (same key order as StreamMsg.dumps)
+        self._chunk_head = (
+            '{"type": "chunk", "turn_id": ' + json.dumps(turn_id) + ', "data": '
+        )
+        self._chunk_tail = ', "auto_trigger": true}' if is_auto else "}"
+
+    def _encode_chunk(self, text: str) -> str:
+        return (
+            self._chunk_head
+            + _json_encode(text)
+            + ', "timestamp": '
+            + repr(time.time())
+            + self._chunk_tail
+        )
 
     async def _send(
         self, msg_type: str, data: Any = "", meta: Dict[str, Any] | None = None
-    ):
+    ) -> None:
+        if meta is None:
+            meta = {}
+        if self.is_auto:
+            meta["auto_trigger"] = True
+        await self._send_raw(
+            StreamMsg(msg_type, self.turn_id, time.time(), data, meta).dumps()
+        )
+
+    async def _send_raw(self, text: str) -> None:
         if self._closed:
             return
         try:
-            if meta is None:
-                meta = {}
-            if self.is_auto:
-                meta["auto_trigger"] = True
-            await self.ws.send(
-                StreamMsg(msg_type, self.turn_id, time.time(), data, meta).dumps()
-            )
+            await self.ws.send(text)
         except (websockets.exceptions.ConnectionClosed, BrokenPipeError):
             self._closed = True
         except Exception:
             pass
 
-    def _schedule(
-        self, msg_type: str, data: Any = "", meta: Dict[str, Any] | None = None
-    ):
-        if self._closed:
-            return
+    def _submit(self, coro) -> None:
         try:
-            future = asyncio.run_coroutine_threadsafe(
-                self._send(msg_type, data, meta), self.loop
-            )
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
             # Don't wait - fire and forget for streaming speed
         except RuntimeError:
+            coro.close()
             self._closed = True
 
+    def _schedule(
+        self, msg_type: str, data: Any = "", meta: Dict[str, Any] | None = None
+    ) -> None:
+        if self._closed:
+            return
+        # Seal the open chunk batch so later chunks can't be merged into a
+        # message that goes out ahead of this one
+        with self._pending_lock:
+            if self._pending:
+                self._pending = []
+        self._submit(self._send(msg_type, data, meta))
+
+    def _schedule_chunk(self, text: str) -> None:
+        if self._closed:
+            return
+        # Tokens arrive much faster than the loop sends them; only the first
+        # chunk of a batch schedules a send, the rest ride along with it
+        with self._pending_lock:
+            batch = self._pending
+            batch.append(text)
+            if len(batch) > 1:
+                return
+        self._submit(self._flush_chunks(batch))
+
+    async def _flush_chunks(self, batch: list) -> None:
+        with self._pending_lock:
+            if self._pending is batch:
+                self._pending = []
+            text = "".join(batch)
+        await self._send_raw(self._encode_chunk(text))
+
     def __call__(self, **kwargs: Any) -> None:
         if self._closed:
             return
@@ -256,7 +685,10 @@ class WSCallback:
 
         # Stream text chunks immediately
         if data:
-            self._schedule("chunk", data)
+            if isinstance(data, str):
+                self._schedule_chunk(data)
+            else:
+                self._schedule("chunk", data)
 
         # Stream tool start
         if isinstance(current_tool_use, dict) and current_tool_use.get("name"):
@@ -305,13 +737,11 @@ class WSCallback:
                         # Broadcast history entries immediately when agent adds them
                         if tool_name == "history" and success:
                             try:
-                                result_content = tool_result.get("content", [])
-                                for rc in result_content:
-                                    if isinstance(rc, dict) and rc.get("text"):
-                                        rec = json.loads(rc["text"])
-                                        if isinstance(rec, dict) and rec.get("ts"):
-                                            # rec goes into msg.data which frontend expects
-                                            self._schedule("history", rec)
+                                for text in _result_texts(tool_result):
+                                    rec = json.loads(text)
+                                    if isinstance(rec, dict) and rec.get("ts"):
+                                        # rec goes into msg.data which frontend expects
+                                        self._schedule("history", rec)
                             except:
                                 pass
 
@@ -319,25 +749,22 @@ class WSCallback:
                         # Parse __WS__: marker from tool result content
                         if tool_name == "interface" and success:
                             try:
-                                result_content = tool_result.get("content", [])
-                                for i, rc in enumerate(result_content):
-                                    text = (
-                                        rc.get("text", "")
-                                        if isinstance(rc, dict)
-                                        else str(rc)
-                                    )
+                                for text in _result_texts(tool_result):
                                     if text.startswith("__WS__:"):
                                         ws_json = text[7:]  # Strip "__WS__:" prefix
                                         ws_msg = json.loads(ws_json)
                                         msg_type = ws_msg.get("type", "ui_render")
                                         # Pass ws_msg as meta so properties are spread into payload
                                         self._schedule(msg_type, "", ws_msg)
-                                        print(
-                                            f"[WS] Broadcast {msg_type}: {ws_msg.get('widget_id', 'unknown')}"
+                                        logger.debug(
+                                            "[WS] Broadcast %s: %s",
+                                            msg_type,
+                                            ws_msg.get("widget_id", "unknown"),
                                         )
-                            except Exception as e:
-                                print(f"[WS] Error broadcasting interface result: {e}")
-                                traceback.print_exc()
+                            except Exception:
+                                logger.exception(
+                                    "[WS] Error broadcasting interface result"
+                                )
 
 
 # ============================================================================
@@ -345,6 +772,30 @@ class WSCallback:
 # ============================================================================
 
 
+# Bounded repr for history values going into the prompt - large dicts are
+# summarized without building their full str() first
+_CLIP_REPR = reprlib.Repr()
+_CLIP_REPR.maxlevel = 3
+_CLIP_REPR.maxdict = 8
+_CLIP_REPR.maxlist = 8
+_CLIP_REPR.maxstring = 80
+_CLIP_REPR.maxother = 200
+
+
+def _clip(value: Any, limit: int = 200) -> str:
+    """Short, bounded text form of a history value for the prompt."""
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "..."
+    return _CLIP_REPR.repr(value)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_prompt_file(path: str, mtime_ns: int) -> str:
+    """Read a prompt file once per modification (mtime_ns is the cache key)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
 def create_trading_agent(client_config: dict = None) -> Agent:
     """Create a trading agent with CCXT and history tools.
 
@@ -380,7 +831,7 @@ def create_trading_agent(client_config: dict = None) -> Agent:
             else:
                 provider = "ollama"
 
-    print(f"[AGENT] Creating agent with provider: {provider}")
+    logger.info("[AGENT] Creating agent with provider: %s", provider)
 
     # Create model based on provider
     model_id = client_config.get("modelId") or os.getenv("STRANDS_MODEL_ID", "")
@@ -429,137 +880,90 @@ def create_trading_agent(client_config: dict = None) -> Agent:
                 keep_alive="5m",
             )
 
-    system_prompt = """You are an AUTONOMOUS cryptocurrency trading agent with FULL TRADING AUTHORITY.
-
-## Core Identity:
-You are not an assistant - you are an autonomous trading agent that:
-- Monitors markets and EXECUTES trades independently
-- Remembers everything through history (your memory)
-- Makes trading decisions based on analysis
-- Manages positions over time
-- Operates like a professional trader 24/7
-
-## Your Memory System (CRITICAL):
-The `history` tool is your persistent memory:
-- **Read**: history(action="tail", limit=30) - Review recent notes/trades
-- **Note**: history(action="add", type="note", data={"message": "..."})
-- **Signal**: history(action="add", type="signal", data={"symbol": "...", "action": "buy/sell"})
-- **Trade**: history(action="add", type="trade", data={"symbol": "...", "side": "buy", "amount": ..., "price": ...})
-
-## Tools:
-1. **use_ccxt** - TRADING & DATA
-   - fetch_ticker: Get current price
-   - fetch_ohlcv: Get candles for analysis
-   - fetch_balance: Check your funds
-   - create_order: EXECUTE BUY/SELL orders
-   - cancel_order: Cancel open orders
-   
-2. **history** - YOUR MEMORY (use it!)
-   
-3. **interface** - Dashboard UI
+    # Add custom prompt from file (the env prompt is already in BASE_SYSTEM_PROMPT)
+    full_prompt = BASE_SYSTEM_PROMPT
+    custom_prompt_file = SERVER_CONFIG.custom_prompt_file
 
-## Trading Authority:
-YOU ARE AUTHORIZED TO:
-- Execute market and limit orders
-- Buy and sell any watched symbol
-- Scale in and out of positions
-- Manage your own risk
-
-## Trading Rules:
-- Always check balance before trading
-- Start small ($10-50 per trade)
-- Log reasoning BEFORE executing
-- Log fill details AFTER executing
-- Track P&L in your notes
-- Never risk more than 10% on one trade
-
-## Decision Framework:
-- **BUY**: Support holds, oversold, momentum reversal
-- **SELL**: Resistance hit, overbought, momentum fading
-- **HOLD**: Unclear setup, wait for confirmation
-- **EXIT**: Hit target, stop-loss, thesis broken
-
-## Example Trade Flow:
-```
-1. history(tail) → Check memory
-2. use_ccxt(fetch_balance) → Have 100 USDT
-3. use_ccxt(fetch_ticker, BTC/USDT) → $67,050
-4. Analyze: "Support at $67k holding, RSI oversold"
-5. history(add, note) → "Going long BTC - support bounce"
-6. use_ccxt(create_order, buy, market, BTC/USDT, 0.0007) → BUY!
-7. history(add, trade) → Log entry
-```
-
-## Important:
-- You MAKE the trading decisions
-- Log everything to history
-- Be disciplined - follow your rules
-- Learn from past trades in your memory
-"""
-    # Add custom prompt from environment or file
-    custom_prompt = ""
-    custom_prompt_env = os.getenv("DASH_CUSTOM_PROMPT", "")
-    custom_prompt_file = os.getenv("DASH_CUSTOM_PROMPT_FILE", "")
-
-    if custom_prompt_env:
-        custom_prompt = f"\n\n## Custom Instructions:\n{custom_prompt_env}\n"
-    elif custom_prompt_file and os.path.exists(custom_prompt_file):
+    if not SERVER_CONFIG.custom_prompt and custom_prompt_file:
+        # One stat() both checks existence and yields the cache key
         try:
-            with open(custom_prompt_file, "r", encoding="utf-8") as f:
-                custom_prompt = f"\n\n## Custom Instructions:\n{f.read()}\n"
-        except Exception as e:
-            print(f"Warning: Could not load custom prompt file: {e}")
+            mtime_ns = os.stat(custom_prompt_file).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None:
+            try:
+                text = _read_prompt_file(custom_prompt_file, mtime_ns)
+                full_prompt += CUSTOM_INSTRUCTIONS.format(text)
+            except Exception as e:
+                logger.warning("Could not load custom prompt file: %s", e)
 
     # Inject recent history for context
     history_context = ""
     try:
-        recent = history(action="tail", limit=20)
-        items = recent.get("items") or []
+        items = _history_tail(50)
         if items:
-            history_lines = []
-            for item in items[-10:]:  # Last 10 items
-                ts = item.get("ts", 0)
+            # Autonomous wakes tend to log the same note/signal over and over;
+            # keep only the newest copy of each line and cap the count so the
+            # prompt stays the same size however long the bot has been running.
+            # Walk newest-first so older entries past the cap are never
+            # formatted, then flip the short result back to oldest-first.
+            seen = set()
+            newest_first = []
+            for item in reversed(items):
                 ev_type = item.get("type", "note")
                 data = item.get("data", {})
 
                 # Format based on type
-                if ev_type in ("order", "trade", "buy", "sell"):
+                line = None
+                if ev_type in TRADE_EVENT_TYPES:
                     side = data.get("side", ev_type)
                     symbol = data.get("symbol", "")
                     amount = data.get("amount", "")
                     price = data.get("price", "")
-                    history_lines.append(
-                        f"- {side.upper()} {amount} {symbol} @ {price}"
-                    )
+                    line = f"- {side.upper()} {amount} {symbol} @ {price}"
                 elif ev_type == "signal":
-                    history_lines.append(f"- Signal: {data.get('message', data)}")
+                    line = f"- Signal: {_clip(data.get('message', data))}"
                 elif ev_type == "note":
-                    msg = data.get("message", data.get("text", str(data)))
+                    msg = data.get("message", data.get("text"))
+                    if msg is None:
+                        msg = _clip(data)
                     if isinstance(msg, str) and len(msg) < 200:
-                        history_lines.append(f"- Note: {msg}")
+                        line = f"- Note: {msg}"
                 elif ev_type == "theme":
-                    history_lines.append(
+                    line = (
                         f"- Theme changed: {data.get('preset', data.get('title', ''))}"
                     )
 
+                if line is None or line in seen:
+                    continue
+                seen.add(line)
+                newest_first.append(line)
+                if len(newest_first) >= HISTORY_CONTEXT_LINES:
+                    break
+            history_lines = newest_first[::-1]
+
             if history_lines:
                 history_context = (
                     "\n\n## Recent Activity:\n" + "\n".join(history_lines) + "\n"
                 )
     except Exception as e:
-        print(f"Warning: Could not load history context: {e}")
-
-    full_prompt = system_prompt + custom_prompt + history_context
+        logger.warning("Could not load history context: %s", e)
 
     # Add client custom system prompt (if provided)
     client_custom_prompt = client_config.get("systemPrompt", "")
     if client_custom_prompt:
         full_prompt += f"\n\n## User Custom Instructions:\n{client_custom_prompt}\n"
-        print(f"[AGENT] Added custom system prompt ({len(client_custom_prompt)} chars)")
+        logger.info(
+            "[AGENT] Added custom system prompt (%d chars)", len(client_custom_prompt)
+        )
+
+    # Recent history changes between agents, so it goes last to keep the
+    # static instructions above a stable prefix for prompt caching
+    full_prompt += history_context
 
     return Agent(
         model=model,
-        tools=[use_ccxt, history, interface],
+        tools=TRADING_TOOLS,
         system_prompt=full_prompt,
     )
 
@@ -570,31 +974,164 @@ YOU ARE AUTHORIZED TO:
 
 
 def _get_exchange(exchange_id: str, api_key: str = "", api_secret: str = ""):
-    """Get or create cached exchange instance."""
-    cache_key = f"{exchange_id}:{bool(api_key)}"
+    """Get or create cached exchange instance.
+
+    Authenticated instances are keyed by a digest of the credentials, so a
+    key change builds a new instance instead of reusing the old session.
+    """
+    cache_key = exchange_id
+    if api_key and api_secret:
+        digest = hashlib.sha256(f"{api_key}:{api_secret}".encode()).hexdigest()
+        cache_key = f"{exchange_id}:{digest}"
 
-    if cache_key in _ccxt_cache:
-        return _ccxt_cache[cache_key]
+    with _ccxt_lock:
+        instance = _ccxt_cache.get(cache_key)
+        if instance is not None:
+            return instance
 
-    if ccxt is None:
-        raise ImportError("ccxt not installed")
+        if ccxt is None:
+            raise ImportError("ccxt not installed")
 
-    exchange_class = getattr(ccxt, exchange_id)
-    cfg = {"enableRateLimit": True}
+        exchange_class = getattr(ccxt, exchange_id)
+        cfg = {"enableRateLimit": True}
 
-    if exchange_id in ("bybit", "binance", "okx"):
-        cfg["options"] = {"defaultType": "spot"}
+        if exchange_id in ("bybit", "binance", "okx"):
+            cfg["options"] = {"defaultType": "spot"}
 
-    if api_key and api_secret:
-        cfg["apiKey"] = api_key
-        cfg["secret"] = api_secret
+        if api_key and api_secret:
+            cfg["apiKey"] = api_key
+            cfg["secret"] = api_secret
+
+        instance = exchange_class(cfg)
+        _ccxt_cache[cache_key] = instance
+        return instance
+
+
+# (exchange, symbol, timeframe, limit) -> (monotonic expiry, ohlcv).
+# Only touched from the event loop, so no lock.
+_ohlcv_cache: Dict[tuple, tuple] = {}
+
+
+async def _fetch_ohlcv_cached(
+    loop, exchange_id: str, symbol: str, timeframe: str, limit: int
+) -> list:
+    """fetch_ohlcv for the UI chart, reusing a result younger than OHLCV_CACHE_TTL."""
+    key = (exchange_id, symbol, timeframe, limit)
+    now = time.monotonic()
+    hit = _ohlcv_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    exchange_instance = _get_exchange(exchange_id)
+    ohlcv = await loop.run_in_executor(
+        _executor,
+        lambda: exchange_instance.fetch_ohlcv(symbol, timeframe, limit=limit),
+    )
 
-    instance = exchange_class(cfg)
-    _ccxt_cache[cache_key] = instance
-    return instance
+    now = time.monotonic()
+    for k in [k for k, (expiry, _) in _ohlcv_cache.items() if expiry <= now]:
+        del _ohlcv_cache[k]
+    _ohlcv_cache[key] = (now + OHLCV_CACHE_TTL, ohlcv)
+    return ohlcv
+
+
+# (exchange, use_ccxt instance key) pairs warmed or being warmed. Both
+# instances are cached, so one warmup per pair is enough. Only touched from
+# the event loop (done callbacks included), so no lock.
+_warmed: set = set()
+
+
+def _warm_exchanges(exchange_id: str) -> None:
+    """Build and load markets for the exchange ahead of first use.
+
+    Runs in the executor so the first snapshot and the agent's first
+    use_ccxt call don't pay for the TLS handshake and market load.
+    """
+    _get_exchange(exchange_id).load_markets()
+    _warm_exchange(exchange_id)
+
+
+def _schedule_warmup(loop, exchange_id: str) -> None:
+    """Warm the exchange in the background, at most once per instance key.
+
+    The key is the one a config-less use_ccxt call resolves to right now
+    (env credentials, sandbox, ...), so a changed fingerprint warms again.
+    """
+    key = (exchange_id, _exchange_key(exchange_id))
+    if key in _warmed:
+        return
+    _warmed.add(key)
 
+    def _done(fut) -> None:
+        if fut.cancelled():
+            _warmed.discard(key)
+        elif fut.exception() is not None:
+            _warmed.discard(key)  # retry on the next connect
+            logger.warning("[WARMUP] %s: %s", exchange_id, fut.exception())
 
-async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
+    loop.run_in_executor(_executor, _warm_exchanges, exchange_id).add_done_callback(
+        _done
+    )
+
+
+async def fetch_market_snapshot(
+    loop, exchange_id: str, symbols: List[str]
+) -> tuple[str, Dict[str, float]]:
+    """Fetch tickers for all watched symbols concurrently.
+
+    Returns a prompt-ready summary so the agent starts its turn with prices
+    in hand instead of issuing one fetch_ticker tool call per symbol, plus
+    the last price per symbol that was available.
+    """
+    try:
+        exchange_instance = _get_exchange(exchange_id)
+    except Exception as e:
+        return f"- unavailable ({e}) - fetch prices with use_ccxt", {}
+
+    tickers = None
+
+    # One round-trip for all symbols where the exchange supports it
+    if len(symbols) > 1 and exchange_instance.has.get("fetchTickers"):
+        try:
+            batch = await loop.run_in_executor(
+                _executor, exchange_instance.fetch_tickers, symbols
+            )
+            tickers = [
+                batch[s] if s in batch else ValueError("not returned by exchange")
+                for s in symbols
+            ]
+        except Exception:
+            tickers = None
+
+    # Otherwise fetch each symbol concurrently
+    if tickers is None:
+        tickers = await asyncio.gather(
+            *[
+                loop.run_in_executor(_executor, exchange_instance.fetch_ticker, symbol)
+                for symbol in symbols
+            ],
+            return_exceptions=True,
+        )
+
+    lines = []
+    prices = {}
+    for symbol, ticker in zip(symbols, tickers):
+        if isinstance(ticker, Exception):
+            lines.append(f"- {symbol}: unavailable ({ticker})")
+            continue
+        if ticker.get("last") is not None:
+            prices[symbol] = float(ticker["last"])
+        lines.append(
+            f"- {symbol}: last {ticker.get('last')} | 24h {ticker.get('percentage')}% | "
+            f"bid {ticker.get('bid')} / ask {ticker.get('ask')} | "
+            f"high {ticker.get('high')} / low {ticker.get('low')}"
+        )
+    return "\n".join(lines), prices
+
+
+async def handle_ui_action(
+    agent, websocket, payload: dict, client_creds: dict
+) -> None:
     """Handle UI actions directly (bypasses agent for speed)."""
     turn_id = payload.get("turn_id") or f"ui-{uuid.uuid4()}"
     action = payload.get("action")
@@ -606,17 +1143,14 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
         exchange_id = (
             payload.get("exchange")
             or client_creds.get("exchange")
-            or os.getenv("DASH_EXCHANGE", "bybit")
+            or SERVER_CONFIG.exchange
         )
 
         try:
-            exchange_instance = _get_exchange(exchange_id)
-
-            # Run in thread pool to avoid blocking
+            # Runs in the thread pool to avoid blocking
             loop = asyncio.get_running_loop()
-            ohlcv = await loop.run_in_executor(
-                _executor,
-                lambda: exchange_instance.fetch_ohlcv(symbol, timeframe, limit=limit),
+            ohlcv = await _fetch_ohlcv_cached(
+                loop, exchange_id, symbol, timeframe, limit
             )
 
             await websocket.send(
@@ -631,21 +1165,17 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
         except websockets.exceptions.ConnectionClosed:
             pass  # Client disconnected, ignore
         except Exception as e:
-            try:
-                await websocket.send(
-                    StreamMsg(
-                        "error", turn_id, time.time(), f"fetch_ohlcv failed: {e}"
-                    ).dumps()
-                )
-            except:
-                pass
+            await _safe_send(
+                websocket,
+                StreamMsg("error", turn_id, time.time(), f"fetch_ohlcv failed: {e}"),
+            )
         return
 
     if action == "fetch_balance":
         exchange_id = (
             payload.get("exchange")
             or client_creds.get("exchange")
-            or os.getenv("DASH_EXCHANGE", "bybit")
+            or SERVER_CONFIG.exchange
         )
         api_key = (
             payload.get("apiKey")
@@ -659,32 +1189,24 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
         )
 
         if not api_key or not api_secret:
-            try:
-                await websocket.send(
-                    StreamMsg(
-                        "balance",
-                        turn_id,
-                        time.time(),
-                        {
-                            "status": "no_credentials",
-                            "total": {"USDT": 0},
-                            "free": {"USDT": 0},
-                        },
-                    ).dumps()
-                )
-            except:
-                pass
+            await _safe_send(
+                websocket,
+                StreamMsg(
+                    "balance",
+                    turn_id,
+                    time.time(),
+                    {
+                        "status": "no_credentials",
+                        "total": {"USDT": 0},
+                        "free": {"USDT": 0},
+                    },
+                ),
+            )
             return
 
         try:
-            # Create fresh exchange with credentials (don't cache authenticated ones)
-            exchange_class = getattr(ccxt, exchange_id)
-            cfg = {"apiKey": api_key, "secret": api_secret, "enableRateLimit": True}
-
-            if exchange_id in ("bybit", "binance", "okx"):
-                cfg["options"] = {"defaultType": "spot"}
-
-            exchange_instance = exchange_class(cfg)
+            # Cached per credentials - reuses the keep-alive session
+            exchange_instance = _get_exchange(exchange_id, api_key, api_secret)
 
             # Run in thread pool
             loop = asyncio.get_running_loop()
@@ -692,12 +1214,17 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
                 _executor, exchange_instance.fetch_balance
             )
 
-            total = {
-                k: v for k, v in balance.get("total", {}).items() if v and float(v) > 0
-            }
-            free = {
-                k: v for k, v in balance.get("free", {}).items() if v and float(v) > 0
-            }
+            # One pass over the (often hundreds of) listed currencies - free
+            # is never above total, so only non-zero totals need a free check
+            total = {}
+            free = {}
+            all_free = balance.get("free") or {}
+            for k, v in (balance.get("total") or {}).items():
+                if v and float(v) > 0:
+                    total[k] = v
+                    f = all_free.get(k)
+                    if f and float(f) > 0:
+                        free[k] = f
 
             await websocket.send(
                 StreamMsg(
@@ -711,27 +1238,20 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
         except websockets.exceptions.ConnectionClosed:
             pass
         except Exception as e:
-            try:
-                await websocket.send(
-                    StreamMsg(
-                        "balance",
-                        turn_id,
-                        time.time(),
-                        {"status": "error", "error": str(e), "total": {}, "free": {}},
-                    ).dumps()
-                )
-            except:
-                pass
+            await _safe_send(
+                websocket,
+                StreamMsg(
+                    "balance",
+                    turn_id,
+                    time.time(),
+                    {"status": "error", "error": str(e), "total": {}, "free": {}},
+                ),
+            )
         return
 
-    try:
-        await websocket.send(
-            StreamMsg(
-                "error", turn_id, time.time(), f"Unknown action: {action}"
-            ).dumps()
-        )
-    except:
-        pass
+    await _safe_send(
+        websocket, StreamMsg("error", turn_id, time.time(), f"Unknown action: {action}")
+    )
 
 
 # ============================================================================
@@ -741,7 +1261,7 @@ async def handle_ui_action(agent, websocket, payload: dict, client_creds: dict):
 
 async def run_turn(
     agent, websocket, loop, user_text: str, turn_id: str, is_auto: bool = False
-):
+) -> None:
     """Process a user message with streaming."""
     try:
         await websocket.send(
@@ -758,30 +1278,38 @@ async def run_turn(
 
     cb = WSCallback(websocket, loop, turn_id, is_auto=is_auto)
     agent.callback_handler = cb
+    started = time.monotonic()
 
     # Run agent in global thread pool (not creating new one each time!)
     try:
         await loop.run_in_executor(_executor, agent, user_text)
     except Exception as e:
-        try:
-            await websocket.send(
-                StreamMsg("error", turn_id, time.time(), str(e)).dumps()
-            )
-        except:
-            pass
+        await _safe_send(websocket, StreamMsg("error", turn_id, time.time(), str(e)))
 
+    meta = {"duration_ms": int((time.monotonic() - started) * 1000)}
+    if is_auto:
+        meta["auto_trigger"] = True
     try:
         await websocket.send(
-            StreamMsg(
-                "turn_end",
-                turn_id,
-                time.time(),
-                "",
-                {"auto_trigger": is_auto} if is_auto else None,
-            ).dumps()
+            StreamMsg("turn_end", turn_id, time.time(), "", meta).dumps()
         )
     except websockets.exceptions.ConnectionClosed:
         pass
+    _flush_logs()
+
+
+async def run_turn_locked(
+    turn_lock: asyncio.Lock,
+    agent,
+    websocket,
+    loop,
+    user_text: str,
+    turn_id: str,
+    is_auto: bool = False,
+) -> None:
+    """Run a turn once no other turn is active on this client's agent."""
+    async with turn_lock:
+        await run_turn(agent, websocket, loop, user_text, turn_id, is_auto=is_auto)
 
 
 # ============================================================================
@@ -790,16 +1318,38 @@ async def run_turn(
 
 
 async def auto_trigger_loop(
-    agent, websocket, loop, auto_state: AutoTriggerState, client_creds: dict
-):
+    agent,
+    websocket,
+    loop,
+    auto_state: AutoTriggerState,
+    client_creds: dict,
+    turn_lock: asyncio.Lock,
+) -> None:
     """Background task that triggers agent periodically when idle."""
     # Schedule first trigger
     auto_state.schedule_next()
 
+    # Status ticks run on absolute deadlines, so time spent sending status or
+    # running a turn doesn't push every later tick back
+    next_status = loop.time() + STATUS_INTERVAL
+
     while True:
         try:
-            # Check every 10 seconds
-            await asyncio.sleep(10)
+            now = loop.time()
+            if now >= next_status:
+                _flush_logs()
+                next_status += STATUS_INTERVAL
+                if next_status <= now:  # fell behind (long turn) - resync
+                    next_status = now + STATUS_INTERVAL
+
+            # Sleep until the trigger is due or the next status update, whichever
+            # comes first - control messages wake us early via auto_state.wake()
+            timeout = min(next_status - now, auto_state.seconds_until_trigger())
+            try:
+                await asyncio.wait_for(auto_state.wake_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            auto_state.wake_event.clear()
 
             # Send status update to client
             try:
@@ -818,32 +1368,73 @@ async def auto_trigger_loop(
             if not auto_state.should_trigger():
                 continue
 
+            # Agent is already working on a turn - skip this wake rather than
+            # queueing an LLM call behind it
+            if turn_lock.locked():
+                interval = auto_state.schedule_next()
+                logger.info(
+                    "[AUTO] Agent busy, skipping wake - next in %d minutes",
+                    interval // 60,
+                )
+                continue
+
+            # Configured quiet window (DASH_QUIET_HOURS) - no snapshot, no LLM
+            if time.gmtime().tm_hour in SERVER_CONFIG.quiet_hours:
+                interval = auto_state.schedule_next()
+                logger.info(
+                    "[AUTO] Quiet hours (UTC), skipping wake - next in %d minutes",
+                    interval // 60,
+                )
+                continue
+
+            # Prefetch prices for all watched symbols in parallel
+            snapshot, prices = await fetch_market_snapshot(
+                loop, client_creds["exchange"], auto_state.symbols
+            )
+
+            # Quiet market since the last wake - nothing new for the agent to
+            # act on, so save the LLM call (bounded by IDLE_MAX_SKIPS)
+            if not auto_state.market_moved(prices, SERVER_CONFIG.idle_move_pct):
+                auto_state.idle_skips += 1
+                interval = auto_state.schedule_next()
+                logger.info(
+                    "[AUTO] Market quiet (<%s%%), skipping wake - next in %d minutes",
+                    SERVER_CONFIG.idle_move_pct,
+                    interval // 60,
+                )
+                continue
+            auto_state.idle_skips = 0
+            auto_state.last_prices = prices
+
             # Build autonomous prompt with context
-            symbols_str = ", ".join(auto_state.symbols)
-            prompt = AUTONOMOUS_PROMPT.format(
+            prompt = AUTONOMOUS_PROMPT + AUTONOMOUS_CONTEXT.format(
                 count=auto_state.trigger_count + 1,
-                symbols=symbols_str
+                symbols=auto_state.symbols_str,
+                snapshot=snapshot,
             )
 
-            print(f"[AUTO] Autonomous wake #{auto_state.trigger_count + 1}")
+            logger.info("[AUTO] Autonomous wake #%d", auto_state.trigger_count + 1)
 
             # Run the agent
+            wake_started = time.monotonic()
             turn_id = f"auto-{uuid.uuid4()}"
-            await run_turn(agent, websocket, loop, prompt, turn_id, is_auto=True)
+            await run_turn_locked(
+                turn_lock, agent, websocket, loop, prompt, turn_id, is_auto=True
+            )
 
-            # Advance snooze and schedule next
+            # Advance snooze and schedule next, counted from this wake's start
             auto_state.advance_snooze()
-            interval = auto_state.schedule_next()
-            print(f"[AUTO] Next wake in {interval // 60} minutes")
+            interval = auto_state.schedule_next(started=wake_started)
+            logger.info("[AUTO] Next wake in %d minutes", interval // 60)
 
         except websockets.exceptions.ConnectionClosed:
-            print("[AUTO] Client disconnected, stopping auto-trigger")
+            logger.info("[AUTO] Client disconnected, stopping auto-trigger")
             break
         except asyncio.CancelledError:
-            print("[AUTO] Auto-trigger cancelled")
+            logger.info("[AUTO] Auto-trigger cancelled")
             break
         except Exception as e:
-            print(f"[AUTO] Error: {e}")
+            logger.error("[AUTO] Error: %s", e)
             await asyncio.sleep(30)  # Back off on error
 
 
@@ -852,13 +1443,12 @@ async def auto_trigger_loop(
 # ============================================================================
 
 
-async def handle_client(websocket):
+async def handle_client(websocket) -> None:
     """Handle a WebSocket client connection."""
     loop = asyncio.get_running_loop()
 
     # Change to project root
-    proj_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    os.chdir(proj_root)
+    os.chdir(PROJ_ROOT)
 
     # Client config (can be updated via 'config' message)
     client_config = {
@@ -872,19 +1462,24 @@ async def handle_client(websocket):
 
     # Client credentials
     client_creds = {
-        "exchange": os.getenv("DASH_EXCHANGE", "bybit"),
+        "exchange": SERVER_CONFIG.exchange,
         "apiKey": os.getenv("CCXT_API_KEY", ""),
         "apiSecret": os.getenv("CCXT_SECRET", ""),
     }
 
     # Auto-trigger state for this client
     auto_state = AutoTriggerState(
-        enabled=os.getenv("DASH_AUTO_TRIGGER", "true").lower() == "true",
-        symbols=os.getenv("DASH_SYMBOLS", "BTC/USDT,ETH/USDT").split(","),
+        enabled=SERVER_CONFIG.auto_trigger,
+        symbols=list(SERVER_CONFIG.symbols),
     )
 
-    # Create agent for this connection (will be recreated if config changes)
-    agent = create_trading_agent(client_config)
+    # Create agent for this connection (will be recreated if config changes).
+    # Model setup and the prompt/history reads are blocking, so keep them off
+    # the event loop that is serving every other client.
+    agent = await loop.run_in_executor(_executor, create_trading_agent, client_config)
+
+    # Warm the exchange in the background - not awaited, nothing depends on it
+    _schedule_warmup(loop, client_creds["exchange"])
 
     # Send connected message
     try:
@@ -896,8 +1491,7 @@ async def handle_client(websocket):
 
     # Send history sync
     try:
-        tail = history(action="tail", limit=200)
-        items = tail.get("items") or []
+        items = await loop.run_in_executor(_executor, _history_tail, 200)
         await websocket.send(StreamMsg("history_sync", "", time.time(), items).dumps())
     except websockets.exceptions.ConnectionClosed:
         return
@@ -905,20 +1499,20 @@ async def handle_client(websocket):
         pass
 
     # Send initial auto-trigger status
-    try:
-        await websocket.send(
-            StreamMsg(
-                "auto_trigger_status", "", time.time(), auto_state.get_status()
-            ).dumps()
-        )
-    except:
-        pass
+    await _safe_send(
+        websocket,
+        StreamMsg("auto_trigger_status", "", time.time(), auto_state.get_status()),
+    )
 
     active_tasks = set()
 
+    # One turn at a time - the agent keeps a single conversation and must not
+    # be invoked concurrently by user messages and auto-triggers
+    turn_lock = asyncio.Lock()
+
     # Start auto-trigger background task
     auto_trigger_task = asyncio.create_task(
-        auto_trigger_loop(agent, websocket, loop, auto_state, client_creds)
+        auto_trigger_loop(agent, websocket, loop, auto_state, client_creds, turn_lock)
     )
     active_tasks.add(auto_trigger_task)
 
@@ -939,7 +1533,7 @@ async def handle_client(websocket):
 
                     # Full config update from client UI
                     if isinstance(payload, dict) and payload.get("type") == "config":
-                        print("[CONFIG] Received client configuration")
+                        logger.info("[CONFIG] Received client configuration")
 
                         # Update model config
                         if payload.get("provider"):
@@ -972,15 +1566,18 @@ async def handle_client(websocket):
                         # Update auto-trigger settings
                         if "autoTrigger" in payload:
                             auto_state.enabled = payload["autoTrigger"]
+                            auto_state.wake()
                         if payload.get("symbols"):
-                            symbols = payload["symbols"]
-                            if isinstance(symbols, str):
-                                symbols = [s.strip() for s in symbols.split(",")]
-                            auto_state.symbols = symbols
+                            auto_state.set_symbols(payload["symbols"])
 
                         # Recreate agent with new config
-                        print(f"[CONFIG] Recreating agent with provider: {client_config['provider']}")
-                        agent = create_trading_agent(client_config)
+                        logger.info(
+                            "[CONFIG] Recreating agent with provider: %s",
+                            client_config["provider"],
+                        )
+                        agent = await loop.run_in_executor(
+                            _executor, create_trading_agent, client_config
+                        )
 
                         await websocket.send(
                             StreamMsg(
@@ -1030,18 +1627,17 @@ async def handle_client(websocket):
                         elif action == "pause":
                             # Pause for N minutes
                             mins = int(payload.get("minutes", 30))
-                            auto_state.paused_until = time.time() + mins * 60
+                            auto_state.paused_until = time.monotonic() + mins * 60
                         elif action == "resume":
                             auto_state.paused_until = 0
                         elif action == "trigger_now":
                             # Manual trigger
-                            auto_state.next_trigger = time.time()
+                            auto_state.next_trigger = time.monotonic()
                         elif action == "set_symbols":
-                            symbols = payload.get("symbols", [])
-                            if symbols:
-                                auto_state.symbols = symbols
+                            auto_state.set_symbols(payload.get("symbols", []))
                         elif action == "status":
                             pass  # Just send status below
+                        auto_state.wake()
 
                         await websocket.send(
                             StreamMsg(
@@ -1077,29 +1673,28 @@ async def handle_client(websocket):
                 except websockets.exceptions.ConnectionClosed:
                     break
                 except Exception as e:
-                    print(f"[ERROR] Message handling error: {e}")
+                    logger.error("[ERROR] Message handling error: %s", e)
                     pass
 
             # Exit command
             if raw.lower() == "exit":
-                try:
-                    await websocket.send(
-                        StreamMsg("disconnected", "", time.time(), "bye").dumps()
-                    )
-                except:
-                    pass
+                await _safe_send(
+                    websocket, StreamMsg("disconnected", "", time.time(), "bye")
+                )
                 break
 
             # Agent message
             turn_id = str(uuid.uuid4())
-            task = asyncio.create_task(run_turn(agent, websocket, loop, raw, turn_id))
+            task = asyncio.create_task(
+                run_turn_locked(turn_lock, agent, websocket, loop, raw, turn_id)
+            )
             active_tasks.add(task)
             task.add_done_callback(active_tasks.discard)
 
     except websockets.exceptions.ConnectionClosed:
         pass  # Normal disconnect
     except Exception as e:
-        print(f"Client handler error: {e}")
+        logger.error("Client handler error: %s", e)
 
     # Cancel active tasks on disconnect
     for task in active_tasks:
@@ -1108,6 +1703,7 @@ async def handle_client(websocket):
 
     if active_tasks:
         await asyncio.gather(*active_tasks, return_exceptions=True)
+    _flush_logs()
 
 
 # ============================================================================
@@ -1115,20 +1711,72 @@ async def handle_client(websocket):
 # ============================================================================
 
 
-async def amain():
-    host = os.getenv("DASH_HOST", "0.0.0.0")
-    port = int(os.getenv("DASH_PORT", "8090"))
+async def amain() -> None:
+    host = SERVER_CONFIG.host
+    port = SERVER_CONFIG.port
 
-    async with websockets.serve(handle_client, host, port):
-        print(f"🚀 HashTrade Server running: ws://{host}:{port}")
-        print(f"📊 Open web/index.html and click Connect")
-        print(f"⏰ Auto-trigger: {os.getenv('DASH_AUTO_TRIGGER', 'true')}")
-        print(f"📈 Symbols: {os.getenv('DASH_SYMBOLS', 'BTC/USDT,ETH/USDT')}")
-        await asyncio.Future()
+    # SIGINT/SIGTERM end the serve block below, which closes every client
+    # connection so their handlers cancel auto-trigger tasks and exit cleanly
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows - fall back to KeyboardInterrupt
+
+    # Bound how long a buffered log line waits, whether or not any client
+    # is connected to drive the turn-end/status flushes
+    def flush_tick() -> None:
+        _flush_logs()
+        loop.call_later(LOG_FLUSH_INTERVAL, flush_tick)
 
+    loop.call_later(LOG_FLUSH_INTERVAL, flush_tick)
 
-def main():
-    asyncio.run(amain())
+    async with websockets.serve(handle_client, host, port):
+        # One write + flush for the whole banner instead of a print per line
+        sys.stdout.write(
+            "".join(
+                [
+                    f"🚀 HashTrade Server running: ws://{host}:{port}\n",
+                    "📊 Open web/index.html and click Connect\n",
+                    f"⏰ Auto-trigger: {SERVER_CONFIG.auto_trigger}\n",
+                    f"📈 Symbols: {','.join(SERVER_CONFIG.symbols)}\n",
+                ]
+            )
+        )
+        sys.stdout.flush()
+        _flush_logs()
+        await stop.wait()
+        logger.info("Shutting down")
+        _flush_logs()
+
+
+def main() -> None:
+    global _log_buffer
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    _log_buffer = logging.handlers.MemoryHandler(
+        LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=stream
+    )
+    # Configure only the server's own logger; third-party libraries keep the
+    # root default (WARNING and up via logging's last-resort handler)
+    logger.addHandler(_log_buffer)
+    logger.setLevel(SERVER_CONFIG.log_level)
+    logger.propagate = False
+
+    # Optional pinning keeps the event loop on the same (ideally isolated)
+    # cores between wakes, so wake-up latency doesn't depend on migration
+    if SERVER_CONFIG.cpu_affinity:
+        try:
+            os.sched_setaffinity(0, SERVER_CONFIG.cpu_affinity)
+            logger.info("[CPU] Pinned to CPUs %s", list(SERVER_CONFIG.cpu_affinity))
+        except (AttributeError, OSError) as e:
+            logger.warning("Could not set CPU affinity: %s", e)
+
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(amain())
 
 
 if __name__ == "__main__":
@@ -13,50 +13,256 @@ Event schema (suggested):
   {"ts": 173..., "type": "tool_start|tool_end|balance|order|ui|note|error", "turn_id":"...", "data": {...}}
 """
 
+import atexit
 import json
+import logging
+import mmap
 import os
+import queue
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from strands import tool
 
+# Optional faster JSON (Rust extension); history is written on every tool
+# event and re-parsed for every tail
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("hashtrade")
+
 DATA_DIR = Path(os.getenv("DASH_DATA_DIR", "./data")).resolve()
 HISTORY_FILE = DATA_DIR / "history.jsonl"
 
+# One shared encoder - json.dumps with non-default options builds a new one
+# on every call
+_json_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def _encode_line(rec: Dict[str, Any]) -> bytes:
+    """One JSONL line as UTF-8 bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # non-str keys or types orjson can't encode
+    return (_json_encode(rec) + "\n").encode("utf-8")
+
+
+def _decode_line(ln: str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(ln)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the stdlib encoder
+    return json.loads(ln)
+
 
-def _ensure():
+_ensured = False  # data dir + file created this process
+
+# Automatic/meta events that tail() hides - only explicit history entries
+# (note, trade, signal, ...) are returned
+SKIP_TYPES = frozenset({"tool_start", "tool_end", "ui", "balance", "raw"})
+
+
+def _ensure(force: bool = False) -> None:
+    # Every add/tail used to mkdir + stat; do it once and only redo it if a
+    # write finds the directory gone.
+    global _ensured
+    if _ensured and not force:
+        return
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     if not HISTORY_FILE.exists():
         HISTORY_FILE.touch()
+    _ensured = True
+
+
+# Automatic records (interface renders) are handed to one writer thread so
+# tool calls never wait on the filesystem; it drains whatever has queued up
+# into a single write. Explicit history(action="add") writes stay synchronous.
+_write_queue: "queue.Queue[bytes]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_write_error: Optional[BaseException] = None  # last failed background write
+
+
+def _append(event_type: str, data: Dict[str, Any], turn_id: str = "") -> Dict[str, Any]:
+    """Queue one record for the history file and return it."""
+    return _append_encoded(event_type, data, turn_id)[0]
+
+
+def _append_encoded(
+    event_type: str, data: Dict[str, Any], turn_id: str = "", sync: bool = False
+) -> tuple[Dict[str, Any], bytes]:
+    """Like _append, but also return the encoded JSONL line for reuse.
+
+    With sync=True the line is written before returning and write errors
+    propagate to the caller.
+    """
+    rec = {
+        "ts": time.time(),
+        "type": event_type,
+        "turn_id": turn_id,
+        "data": data,
+    }
+    line = _encode_line(rec)
+    if sync:
+        _write(line)
+        return rec, line
+    if _writer is None:
+        _start_writer()
+    _write_queue.put(line)
+    return rec, line
+
+
+def _start_writer() -> None:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(
+                target=_writer_loop, name="history-writer", daemon=True
+            )
+            _writer.start()
+            atexit.register(_write_queue.join)
+
+
+def _writer_loop() -> None:
+    global _write_error
+    while True:
+        batch = [_write_queue.get()]
+        while True:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _write(b"".join(batch))
+        except Exception as e:
+            # Keep the writer alive; the next history tool call reports it
+            logger.exception("[HISTORY] Failed to write %d record(s)", len(batch))
+            _write_error = e
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+
+def _flush() -> None:
+    """Block until every queued record has been written (or failed)."""
+    if _writer is not None:
+        _write_queue.join()
+
+
+def _raise_write_error() -> None:
+    """Raise (once) if a background write failed since the last check."""
+    global _write_error
+    err, _write_error = _write_error, None
+    if err is not None:
+        raise OSError(f"History write failed, records were lost: {err}") from err
+
+
+def _write(payload: bytes) -> None:
+    _ensure()
+    # One O_APPEND write per batch: the writer is the only appender in this
+    # process, but a buffered text file may still split a long line across
+    # several writes that tear on a crash. A single append write lands whole.
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    try:
+        fd = os.open(HISTORY_FILE, flags, 0o644)
+    except FileNotFoundError:
+        _ensure(force=True)
+        fd = os.open(HISTORY_FILE, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:  # os.write may be partial on odd filesystems
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+# (path, n) -> ((st_mtime_ns, st_size), lines), least recently used first.
+# Callers ask for different n (prompt context, connect sync, agent tail), so
+# keep a few sizes instead of one slot they keep evicting from each other.
+_tail_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_TAIL_CACHE_SIZE = 4
+_tail_lock = threading.Lock()  # tails are read from executor threads
 
 
 def _read_last_lines(path: Path, n: int) -> list[str]:
-    # Small/fast: read whole file if small, else tail by blocks
+    # mmap the file and rfind newlines back from the end, so only the tail
+    # pages are touched and copied no matter how large the file has grown.
+    # Unchanged files cost one stat().
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return []
+    key = (path, n)
+    with _tail_lock:
+        cached = _tail_cache.get(key)
+        if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+            _tail_cache.move_to_end(key)
+            return list(cached[1])
+
     try:
-        size = path.stat().st_size
-        if size <= 1024 * 1024:  # 1MB
-            return path.read_text(encoding="utf-8", errors="ignore").splitlines()[-n:]
-    except Exception:
-        pass
-
-    # Tail by reading blocks from end
-    lines: list[str] = []
-    block = 8192
-    with path.open("rb") as f:
-        f.seek(0, 2)
-        end = f.tell()
-        pos = end
-        buf = b""
-        while pos > 0 and len(lines) <= n:
-            read_size = block if pos >= block else pos
-            pos -= read_size
-            f.seek(pos)
-            buf = f.read(read_size) + buf
-            lines = buf.splitlines()
-        # decode last n lines
-        out = [ln.decode("utf-8", errors="ignore") for ln in lines[-n:]]
-        return out
+        f = path.open("rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        # Size and stamp from the open handle: a clear between the stat()
+        # above and here would otherwise hand mmap an empty file
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return []
+        stamp = (st.st_mtime_ns, st.st_size)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            start = end - 1 if mm[end - 1 : end] == b"\n" else end
+            for _ in range(n):
+                start = mm.rfind(b"\n", 0, start)
+                if start < 0:
+                    break
+            buf = mm[start + 1 : end]
+    # decode last n lines
+    out = [ln.decode("utf-8", errors="ignore") for ln in buf.splitlines()[-n:]]
+    with _tail_lock:
+        _tail_cache[key] = (stamp, out)
+        _tail_cache.move_to_end(key)
+        while len(_tail_cache) > _TAIL_CACHE_SIZE:
+            _tail_cache.popitem(last=False)
+    return list(out)
+
+
+def _tail(limit: int = 200) -> list[Dict[str, Any]]:
+    """Return the last `limit` explicit history entries (no tool wrapping)."""
+    _flush()  # read-your-writes for records still in the queue
+    raw_lines = _read_last_lines(
+        HISTORY_FILE, max(1, limit * 2)
+    )  # Read extra to account for filtering
+    items = []
+
+    for ln in raw_lines:
+        ln = (ln or "").strip()
+        if not ln:
+            continue
+        try:
+            rec = _decode_line(ln)
+            rec_type = rec.get("type", "")
+
+            # Skip automatic/meta events - only show explicit history entries
+            if rec_type in SKIP_TYPES:
+                continue
+
+            items.append(rec)
+        except Exception:
+            # skip invalid entries
+            continue
+
+    # Return only the requested limit after filtering
+    return items[-limit:] if len(items) > limit else items
 
 
 @tool
@@ -75,57 +281,32 @@ def history(
       - clear: truncate
     """
     _ensure()
+    _flush()
+    if action in ("add", "clear"):
+        _raise_write_error()  # don't report a write on top of lost records
 
     if action == "add":
-        rec = {
-            "ts": time.time(),
-            "type": event_type,
-            "turn_id": turn_id,
-            "data": data or {},
-        }
-        with HISTORY_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        # Reuse the line written to disk instead of encoding the record twice
+        rec, line = _append_encoded(event_type, data or {}, turn_id, sync=True)
         return {
             "status": "success",
-            "content": [{"text": json.dumps(rec, ensure_ascii=False)}],
+            "content": [{"text": line[:-1].decode("utf-8")}],
             "record": rec,
         }
 
     if action == "tail":
-        limit = int(limit or 200)
-        raw_lines = _read_last_lines(
-            HISTORY_FILE, max(1, limit * 2)
-        )  # Read extra to account for filtering
-        items = []
-
-        # ONLY show explicit history entries (note, trade, signal, etc.)
-        # SKIP all automatic events (tool_start, tool_end, ui, balance, raw)
-        SKIP_TYPES = {"tool_start", "tool_end", "ui", "balance", "raw"}
-
-        for ln in raw_lines:
-            ln = (ln or "").strip()
-            if not ln:
-                continue
-            try:
-                rec = json.loads(ln)
-                rec_type = rec.get("type", "")
-
-                # Skip automatic/meta events - only show explicit history entries
-                if rec_type in SKIP_TYPES:
-                    continue
-
-                items.append(rec)
-            except Exception:
-                # skip invalid entries
-                continue
-
-        # Return only the requested limit after filtering
-        items = items[-limit:] if len(items) > limit else items
-        return {
+        items = _tail(int(limit or 200))
+        result = {
             "status": "success",
-            "content": [{"text": json.dumps(items, ensure_ascii=False)}],
+            "content": [{"text": _json_encode(items)}],
             "items": items,
         }
+        # Reads still succeed; the error is left for the next write to raise
+        if _write_error is not None:
+            result["warning"] = (
+                f"History write failed, records were lost: {_write_error}"
+            )
+        return result
 
     if action == "clear":
         HISTORY_FILE.write_text("", encoding="utf-8")
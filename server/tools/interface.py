@@ -20,9 +20,9 @@ from strands import tool
 
 # Import history for adding to timeline - handle both direct and package imports
 try:
-    from .history import HISTORY_FILE, _ensure
+    from .history import _append
 except ImportError:
-    from server.tools.history import HISTORY_FILE, _ensure
+    from server.tools.history import _append
 
 # Default theme (neon green)
 DEFAULT_THEME = {
@@ -158,16 +158,7 @@ def _add_to_history(
     event_type: str, data: Dict[str, Any], widget_id: str = ""
 ) -> Dict[str, Any]:
     """Add an entry to history so it appears in the History of Actions panel."""
-    _ensure()
-    rec = {
-        "ts": time.time(),
-        "type": event_type,
-        "turn_id": widget_id,
-        "data": data,
-    }
-    with HISTORY_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    return rec
+    return _append(event_type, data, widget_id)
 
 
 @tool
@@ -281,6 +272,7 @@ def interface(
     """
     global _current_theme
     ts = time.time()
+    widget_id_given = bool(widget_id)
     widget_id = widget_id or f"ui-{int(ts * 1000)}"
 
     # ========== THEME ACTIONS ==========
@@ -580,9 +572,10 @@ def interface(
             values = [float(v) for v in data.values()]
 
         max_val = max(values) if values else 1
+        scale = 100 / max_val if max_val else 0  # one division, not one per bar
         bars = ""
         for i, (label, val) in enumerate(zip(labels, values)):
-            pct = (val / max_val) * 100 if max_val else 0
+            pct = val * scale
             bars += f"""
             <div style="display: flex; align-items: center; gap: 8px; margin-bottom: 6px;">
                 <div style="width: 60px; font-size: 11px; color: var(--muted); text-overflow: ellipsis; overflow: hidden;">{label}</div>
@@ -781,7 +774,7 @@ def interface(
             "type": "ui_clear",
             "target": target,
             "widget_id": (
-                widget_id if widget_id != f"ui-{int(ts * 1000)}" else None
+                widget_id if widget_id_given else None
             ),  # Only clear specific if provided
             "timestamp": ts,
         }
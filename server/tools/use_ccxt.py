@@ -11,16 +11,29 @@ Licensed under the Apache License, Version 2.0
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import hashlib
 import json
 import os
+import threading
 import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
+import ccxt
 from strands import tool
 
+# Optional faster JSON (Rust extension) for tool results
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Sensitive keys to redact from output
-SENSITIVE_KEYS = {
+SENSITIVE_KEYS = frozenset({
     "apiKey",
     "secret",
     "password",
@@ -33,7 +46,54 @@ SENSITIVE_KEYS = {
     "api_secret",
     "apikey",
     "apisecret",
-}
+})
+# ...and any key containing one of these (case-insensitive)
+SENSITIVE_SUBSTRINGS = ("secret", "apikey", "password", "token")
+
+# Field names for ccxt's [timestamp, open, high, low, close, volume] rows
+OHLCV_KEYS = ("timestamp", "open", "high", "low", "close", "volume")
+
+# Cap on JSON text returned to the agent for list-like results
+MAX_OUTPUT_CHARS = 12000
+
+# Most symbols one multi_ohlcv call will fetch
+MULTI_MAX_SYMBOLS = 20
+
+# REST exchange instances reused across calls (see _get_exchange), each with
+# its own lock: ccxt sync instances aren't thread-safe (throttle state, the
+# session and markets are mutated unguarded), and concurrent agent turns and
+# executor jobs reach the same cached instance. LRU-bounded: every distinct
+# config/credential set the agent passes gets its own entry.
+_exchange_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (instance, lock)
+_EXCHANGE_CACHE_SIZE = 8
+_exchange_lock = threading.Lock()
+
+# Instance locks taken by _get_exchange on this thread while a use_ccxt call
+# (or _holding_instances block) is running; released when it finishes
+_held = threading.local()
+
+# Candles reused for back-to-back calls in one turn (the agent often
+# re-reads the same series a few seconds later). Tickers are never cached:
+# they feed order prices and must be live.
+MARKET_CACHE_TTL = 5.0
+_market_cache: Dict[tuple, tuple] = {}  # key -> (monotonic expiry, result)
+_market_lock = threading.Lock()
+
+# (exception type, message prefix) already reported with a full traceback.
+# A rate-limited or down exchange fails the same way on every call; the
+# stack is formatted (and fed to the agent) only the first time.
+_seen_errors: set = set()
+_SEEN_ERRORS_MAX = 256
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_sensitive(key: str) -> bool:
+    # Exchange payloads repeat the same few hundred keys in every row, so
+    # decide each key once instead of lower() + substring scans per item.
+    if key in SENSITIVE_KEYS:
+        return True
+    key_lower = key.lower()
+    return any(s in key_lower for s in SENSITIVE_SUBSTRINGS)
 
 
 def _redact(obj: Any) -> Any:
@@ -41,10 +101,7 @@ def _redact(obj: Any) -> Any:
     if isinstance(obj, dict):
         out = {}
         for k, v in obj.items():
-            key_lower = str(k).lower()
-            if str(k) in SENSITIVE_KEYS or any(
-                s in key_lower for s in ["secret", "apikey", "password", "token"]
-            ):
+            if _is_sensitive(str(k)):
                 out[k] = "***REDACTED***"
             else:
                 out[k] = _redact(v)
@@ -72,6 +129,40 @@ def _parse_json(value: Any, default: Any = None) -> Any:
     return value
 
 
+def _format_candles(rows: List[list]) -> List[Dict[str, Any]]:
+    """Label OHLCV rows for readability (one zip per row, no per-field indexing)."""
+    return [dict(zip(OHLCV_KEYS, row)) for row in rows]
+
+
+def _dumps(obj: Any) -> str:
+    """JSON-encode a tool result (indent=2), with orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass  # non-str keys or types orjson can't encode
+    return json.dumps(obj, indent=2)
+
+
+def _dumps_capped(obj: Any, limit: int = MAX_OUTPUT_CHARS) -> str:
+    """JSON-encode obj (indent=2), truncated to `limit` characters.
+
+    With orjson a full encode beats the stdlib encoder stopping early, so
+    encode via _dumps and slice. Without it, large results (all tickers,
+    long trade lists) are encoded incrementally up to the limit.
+    """
+    if orjson is not None:
+        return _dumps(obj)[:limit]
+    parts: List[str] = []
+    size = 0
+    for chunk in json.JSONEncoder(indent=2).iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return "".join(parts)[:limit]
+
+
 def _get_secret_env_keys(prefix: str) -> List[str]:
     """Get common environment variable names for API secrets."""
     return [
@@ -154,8 +245,6 @@ def _build_exchange(
     exchange_id: str, config: Optional[Dict[str, Any]] = None, use_pro: bool = False
 ):
     """Build and configure a CCXT exchange instance."""
-    import ccxt
-
     exchange_id = exchange_id.strip().lower()
 
     # Select ccxt or ccxt.pro
@@ -207,6 +296,107 @@ def _build_exchange(
     return ex
 
 
+def _exchange_key(exchange_id: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for an instance: everything that shapes its constructor config."""
+    exchange_id = exchange_id.strip().lower()
+    fingerprint = json.dumps(
+        [
+            exchange_id,
+            _resolve_credentials(exchange_id, config),
+            config,
+            os.getenv("CCXT_TIMEOUT"),
+            os.getenv("CCXT_DEFAULT_TYPE"),
+            os.getenv("CCXT_SANDBOX"),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def _get_exchange(exchange_id: str, config: Optional[Dict[str, Any]] = None):
+    """Get a cached REST exchange instance, building it on first use.
+
+    Instances are keyed by _exchange_key, so repeated tool calls reuse one
+    HTTP session (keep-alive, no new TLS handshake per call) and the markets
+    it has already loaded.
+    """
+    exchange_id = exchange_id.strip().lower()
+    key = _exchange_key(exchange_id, config)
+
+    with _exchange_lock:
+        entry = _exchange_cache.get(key)
+        if entry is None:
+            entry = (_build_exchange(exchange_id, config), threading.Lock())
+            _exchange_cache[key] = entry
+            while len(_exchange_cache) > _EXCHANGE_CACHE_SIZE:
+                _exchange_cache.popitem(last=False)
+        _exchange_cache.move_to_end(key)
+    ex, lock = entry
+
+    # Inside a tool call, keep the instance to this thread until it returns
+    held = getattr(_held, "locks", None)
+    if held is not None and lock not in held:
+        lock.acquire()
+        held.append(lock)
+    return ex
+
+
+def _release_held() -> None:
+    for lock in reversed(getattr(_held, "locks", None) or []):
+        lock.release()
+    _held.locks = None
+
+
+@contextlib.contextmanager
+def _holding_instances():
+    """Lock every instance _get_exchange hands out in this block to this thread."""
+    _held.locks = []
+    try:
+        yield
+    finally:
+        _release_held()
+
+
+def _warm_exchange(exchange_id: str) -> None:
+    """Load markets on the instance a config-less use_ccxt call will use."""
+    with _holding_instances():
+        _get_exchange(exchange_id).load_markets()
+
+
+def _clone_exchange(ex: Any, config: Optional[Dict[str, Any]] = None) -> Any:
+    """A private copy of `ex` for a worker thread, reusing its loaded markets."""
+    clone = _build_exchange(ex.id, config)
+    clone.set_markets(ex.markets, ex.currencies)
+    return clone
+
+
+def _cached_fetch(ex: Any, method: str, *args: Any, **kwargs: Any) -> Any:
+    """ex.<method>(*args, **kwargs), reused for MARKET_CACHE_TTL seconds."""
+    # Keyed on the instance itself, not id(): evicted instances (see
+    # _get_exchange) are freed and their id() can be reused
+    key = (ex, method, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _market_lock:
+        hit = _market_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    result = getattr(ex, method)(*args, **kwargs)
+
+    now = time.monotonic()
+    with _market_lock:
+        for k in [k for k, (expiry, _) in _market_cache.items() if expiry <= now]:
+            del _market_cache[k]
+        _market_cache[key] = (now + MARKET_CACHE_TTL, result)
+    return result
+
+
+def _elapsed_ms(t0: float) -> int:
+    """Milliseconds since a time.perf_counter() start (immune to clock jumps)."""
+    return int((time.perf_counter() - t0) * 1000)
+
+
 def _resolve_exchange_id(exchange: Optional[str]) -> str:
     """Resolve exchange ID from parameter or environment."""
     exchange_id = exchange or os.getenv("CCXT_EXCHANGE")
@@ -240,8 +430,11 @@ def use_ccxt(
     amount: Optional[float] = None,
     price: Optional[float] = None,
     order_id: Optional[str] = None,
+    orders: Optional[str] = None,
     # Multi-exchange
     exchanges: Optional[str] = None,
+    # Multi-symbol
+    symbols: Optional[str] = None,
     # WebSocket parameters
     max_messages: int = 5,
     max_seconds: int = 15,
@@ -268,10 +461,12 @@ def use_ccxt(
             - "fetch_tickers" - Get all tickers
             - "fetch_orderbook" - Get order book for symbol
             - "fetch_ohlcv" - Get OHLCV candles
+            - "multi_ohlcv" - Get OHLCV candles for several symbols at once
             - "fetch_trades" - Get recent trades
 
             Trading:
             - "create_order" - Create new order
+            - "create_orders" - Create several orders in one request
             - "cancel_order" - Cancel existing order
             - "fetch_order" - Get order details
             - "fetch_orders" - Get all orders
@@ -309,10 +504,15 @@ def use_ccxt(
         - amount: Order quantity
         - price: Order price (for limit orders)
         - order_id: Order ID for cancel/fetch operations
+        - orders: JSON array of orders for "create_orders", each
+          {"symbol", "type", "side", "amount", "price"?, "params"?}
 
         Multi-Exchange:
         - exchanges: JSON array of exchange IDs for multi-exchange operations
 
+        Multi-Symbol:
+        - symbols: JSON array of trading pairs for "multi_ohlcv" (at most 20)
+
         WebSocket:
         - max_messages: Max messages to collect (default: 5)
         - max_seconds: Max seconds to stream (default: 15)
@@ -357,6 +557,14 @@ def use_ccxt(
         # Fetch OHLCV candles
         use_ccxt(action="fetch_ohlcv", symbol="BTC/USDT", timeframe="1h", limit=50)
 
+        # Fetch candles for several symbols in one call
+        use_ccxt(
+            action="multi_ohlcv",
+            symbols='["BTC/USDT", "ETH/USDT", "SOL/USDT"]',
+            timeframe="15m",
+            limit=50
+        )
+
         # Create limit order
         use_ccxt(
             action="create_order",
@@ -367,6 +575,14 @@ def use_ccxt(
             price=50000
         )
 
+        # Open several legs at once (one batch request where supported)
+        use_ccxt(
+            action="create_orders",
+            orders='[{"symbol": "BTC/USDT", "type": "market", "side": "buy", '
+                   '"amount": 0.001}, {"symbol": "ETH/USDT", "type": "market", '
+                   '"side": "buy", "amount": 0.01}]'
+        )
+
         # Cancel order
         use_ccxt(action="cancel_order", symbol="BTC/USDT", order_id="12345")
 
@@ -395,9 +611,8 @@ def use_ccxt(
             args='["BTC/USDT:USDT"]'
         )
     """
-    import ccxt
-
-    t0 = time.time()
+    t0 = time.perf_counter()
+    _held.locks = []  # see _get_exchange
 
     try:
         # === LIST EXCHANGES ===
@@ -407,19 +622,18 @@ def use_ccxt(
                 "status": "success",
                 "content": [
                     {
-                        "text": json.dumps(
+                        "text": _dumps(
                             {"count": len(exchanges_list), "exchanges": exchanges_list},
-                            indent=2,
                         )
                     }
                 ],
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === DESCRIBE ===
         if action == "describe":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             info = {
                 "id": ex.id,
@@ -434,22 +648,17 @@ def use_ccxt(
                 "pro": getattr(ex, "pro", False),
             }
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(info), indent=2)}],
+                "content": [{"text": _dumps(_redact(info))}],
                 "exchange": exchange_id,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === LIST METHODS ===
         if action == "list_methods":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             methods = sorted(
                 [
@@ -459,53 +668,40 @@ def use_ccxt(
                 ]
             )
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
                 "content": [
                     {
-                        "text": json.dumps(
-                            {"exchange": ex.id, "methods": methods}, indent=2
-                        )
+                        "text": _dumps({"exchange": ex.id, "methods": methods})
                     }
                 ],
                 "exchange": exchange_id,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === LOAD MARKETS ===
         if action == "load_markets":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             markets = ex.load_markets()
             symbols = sorted(markets.keys())
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
                 "content": [
                     {
-                        "text": json.dumps(
+                        "text": _dumps(
                             {
                                 "exchange": ex.id,
                                 "count": len(symbols),
                                 "symbols": symbols[:500],  # Limit output
                             },
-                            indent=2,
                         )
                     }
                 ],
                 "exchange": exchange_id,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === MARKET DATA: FETCH_TICKER ===
@@ -514,44 +710,34 @@ def use_ccxt(
                 raise ValueError("symbol required for fetch_ticker")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_ticker(symbol)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)}],
+                "content": [{"text": _dumps(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_ticker",
                 "symbol": symbol,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === MARKET DATA: FETCH_TICKERS ===
         if action == "fetch_tickers":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             symbols_list = _parse_json(args) if args else None
             result = ex.fetch_tickers(symbols_list)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_tickers",
                 "count": len(result),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === MARKET DATA: FETCH_ORDERBOOK ===
@@ -560,22 +746,17 @@ def use_ccxt(
                 raise ValueError("symbol required for fetch_orderbook")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_order_book(symbol, limit)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)}],
+                "content": [{"text": _dumps(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_order_book",
                 "symbol": symbol,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === MARKET DATA: FETCH_OHLCV ===
@@ -584,47 +765,78 @@ def use_ccxt(
                 raise ValueError("symbol required for fetch_ohlcv")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
-
-            result = ex.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
-            try:
-                ex.close()
-            except:
-                pass
+            result = _cached_fetch(ex, "fetch_ohlcv", symbol, timeframe, limit=limit)
 
-            # Format OHLCV for readability
-            formatted = [
-                {
-                    "timestamp": candle[0],
-                    "open": candle[1],
-                    "high": candle[2],
-                    "low": candle[3],
-                    "close": candle[4],
-                    "volume": candle[5],
-                }
-                for candle in result
-            ]
+            formatted = _format_candles(result)
 
             return {
                 "status": "success",
                 "content": [
                     {
-                        "text": json.dumps(
+                        "text": _dumps(
                             {
                                 "symbol": symbol,
                                 "timeframe": timeframe,
                                 "count": len(formatted),
                                 "candles": formatted,
                             },
-                            indent=2,
                         )
                     }
                 ],
                 "exchange": exchange_id,
                 "method": "fetch_ohlcv",
                 "symbol": symbol,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
+            }
+
+        # === MARKET DATA: MULTI_OHLCV ===
+        if action == "multi_ohlcv":
+            symbols_list = _parse_json(symbols)
+            if not isinstance(symbols_list, list) or not symbols_list:
+                raise ValueError("symbols must be JSON array of trading pairs")
+            if len(symbols_list) > MULTI_MAX_SYMBOLS:
+                raise ValueError(
+                    f"multi_ohlcv takes at most {MULTI_MAX_SYMBOLS} symbols, "
+                    f"got {len(symbols_list)} - split the request"
+                )
+
+            exchange_id = _resolve_exchange_id(exchange)
+            user_config = _parse_json(config)
+            ex = _get_exchange(exchange_id, user_config)
+            ex.load_markets()  # once; workers copy the loaded markets
+
+            def _fetch(sym: str) -> Dict[str, Any]:
+                try:
+                    # Own instance per worker - the cached one isn't thread-safe
+                    worker_ex = _clone_exchange(ex, user_config)
+                    candles = worker_ex.fetch_ohlcv(sym, timeframe, limit=limit)
+                    return {
+                        "symbol": sym,
+                        "count": len(candles),
+                        "candles": _format_candles(candles),
+                    }
+                except Exception as e:
+                    return {"symbol": sym, "error": str(e)}
+
+            # One round-trip per symbol, issued concurrently
+            syms = [str(s).strip() for s in symbols_list]
+            with ThreadPoolExecutor(max_workers=min(8, len(syms))) as pool:
+                results = list(pool.map(_fetch, syms))
+
+            return {
+                "status": "success",
+                "content": [
+                    {
+                        "text": _dumps_capped(
+                            {"timeframe": timeframe, "results": results}
+                        )
+                    }
+                ],
+                "exchange": exchange_id,
+                "method": "multi_ohlcv",
+                "ms": _elapsed_ms(t0),
             }
 
         # === MARKET DATA: FETCH_TRADES ===
@@ -633,23 +845,18 @@ def use_ccxt(
                 raise ValueError("symbol required for fetch_trades")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_trades(symbol, limit=limit)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_trades",
                 "symbol": symbol,
                 "count": len(result),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === TRADING: CREATE_ORDER ===
@@ -664,23 +871,103 @@ def use_ccxt(
                 raise ValueError("amount required for create_order")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             params = _parse_json(kwargs, {})
             result = ex.create_order(symbol, order_type, side, amount, price, params)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)}],
+                "content": [{"text": _dumps(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "create_order",
                 "order_id": result.get("id"),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
+            }
+
+        # === TRADING: CREATE_ORDERS ===
+        if action == "create_orders":
+            orders_list = _parse_json(orders)
+            if not isinstance(orders_list, list) or not orders_list:
+                raise ValueError("orders must be JSON array of order objects")
+
+            batch = []
+            for i, o in enumerate(orders_list):
+                if not isinstance(o, dict):
+                    raise ValueError(f"orders[{i}] must be an object")
+                o_type = o.get("type") or o.get("order_type")
+                missing = [
+                    k
+                    for k, v in (
+                        ("symbol", o.get("symbol")),
+                        ("type", o_type),
+                        ("side", o.get("side")),
+                        ("amount", o.get("amount")),
+                    )
+                    if v is None
+                ]
+                if missing:
+                    raise ValueError(f"orders[{i}] missing {', '.join(missing)}")
+                batch.append(
+                    {
+                        "symbol": o["symbol"],
+                        "type": o_type,
+                        "side": o["side"],
+                        "amount": o["amount"],
+                        "price": o.get("price"),
+                        "params": o.get("params") or {},
+                    }
+                )
+
+            exchange_id = _resolve_exchange_id(exchange)
+            ex = _get_exchange(exchange_id, _parse_json(config))
+
+            if ex.has.get("createOrders"):
+                # One round-trip for every leg
+                results = ex.create_orders(batch)
+                batched = True
+            else:
+                results = []
+                for o in batch:
+                    try:
+                        results.append(
+                            ex.create_order(
+                                o["symbol"],
+                                o["type"],
+                                o["side"],
+                                o["amount"],
+                                o["price"],
+                                o["params"],
+                            )
+                        )
+                    except Exception as e:
+                        results.append({"symbol": o["symbol"], "error": str(e)})
+                batched = False
+
+            # Indexes (into `orders`) of legs that were not placed
+            failed = [
+                i
+                for i, r in enumerate(results)
+                if not isinstance(r, dict)
+                or r.get("error")
+                or r.get("status") == "rejected"
+            ]
+            payload = {"batched": batched, "orders": _redact(results)}
+            if failed:
+                payload["failed"] = failed
+
+            return {
+                # Strands only knows success/error: a partial fill of the
+                # batch is "success" with a non-empty "failed" list
+                "status": "error" if len(failed) == len(results) else "success",
+                "content": [{"text": _dumps(payload)}],
+                "exchange": exchange_id,
+                "method": "create_orders",
+                "failed": failed,
+                "order_ids": [
+                    r["id"] for r in results if isinstance(r, dict) and r.get("id")
+                ],
+                "ms": _elapsed_ms(t0),
             }
 
         # === TRADING: CANCEL_ORDER ===
@@ -689,22 +976,17 @@ def use_ccxt(
                 raise ValueError("order_id required for cancel_order")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.cancel_order(order_id, symbol)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)}],
+                "content": [{"text": _dumps(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "cancel_order",
                 "order_id": order_id,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === TRADING: FETCH_ORDER ===
@@ -713,51 +995,41 @@ def use_ccxt(
                 raise ValueError("order_id required for fetch_order")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_order(order_id, symbol)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)}],
+                "content": [{"text": _dumps(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_order",
                 "order_id": order_id,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === TRADING: FETCH_ORDERS ===
         if action in ("fetch_orders", "fetch_open_orders", "fetch_closed_orders"):
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             method_name = action
             fn = getattr(ex, method_name)
             result = fn(symbol, limit=limit) if symbol else fn()
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": method_name,
                 "count": len(result),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === ACCOUNT: FETCH_BALANCE ===
         if action == "fetch_balance":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_balance()
 
@@ -767,64 +1039,51 @@ def use_ccxt(
                 "timestamp": result.get("timestamp"),
                 "datetime": result.get("datetime"),
             }
-            for currency, balance in result.items():
-                if isinstance(balance, dict) and (balance.get("total", 0) or 0) > 0:
-                    filtered[currency] = balance
-
-            try:
-                ex.close()
-            except:
-                pass
+            # Walk the compact currency -> total map instead of every key of
+            # the unified result (which also holds info/free/used/total)
+            for currency, amount in (result.get("total") or {}).items():
+                if (amount or 0) > 0 and isinstance(result.get(currency), dict):
+                    filtered[currency] = result[currency]
 
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(filtered, indent=2)}],
+                "content": [{"text": _dumps(filtered)}],
                 "exchange": exchange_id,
                 "method": "fetch_balance",
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === ACCOUNT: FETCH_POSITIONS ===
         if action == "fetch_positions":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             symbols_list = [symbol] if symbol else None
             result = ex.fetch_positions(symbols_list)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_positions",
                 "count": len(result),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === ACCOUNT: FETCH_MY_TRADES ===
         if action == "fetch_my_trades":
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             result = ex.fetch_my_trades(symbol, limit=limit)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": "fetch_my_trades",
                 "count": len(result),
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === MULTI-EXCHANGE: MULTI_ORDERBOOK ===
@@ -836,20 +1095,24 @@ def use_ccxt(
             if not isinstance(exchanges_list, list) or not exchanges_list:
                 raise ValueError("exchanges must be JSON array of exchange IDs")
 
-            rows = []
-            for ex_id in exchanges_list:
+            user_config = _parse_json(config)
+
+            def _top_of_book(ex_id: Any) -> Dict[str, Any]:
                 try:
-                    ex = _build_exchange(str(ex_id).strip(), _parse_json(config))
-                    ob = ex.fetch_order_book(symbol, limit)
+                    # Workers lock their instance like a tool call would, so a
+                    # repeated id (or a concurrent turn) waits its turn
+                    with _holding_instances():
+                        ex = _get_exchange(str(ex_id).strip(), user_config)
+                        ob = ex.fetch_order_book(symbol, limit)
                     bid = ob["bids"][0][0] if ob.get("bids") else None
                     ask = ob["asks"][0][0] if ob.get("asks") else None
-                    rows.append({"exchange": ex.id, "bid": bid, "ask": ask})
-                    try:
-                        ex.close()
-                    except:
-                        pass
+                    return {"exchange": ex.id, "bid": bid, "ask": ask}
                 except Exception as e:
-                    rows.append({"exchange": ex_id, "error": str(e)})
+                    return {"exchange": ex_id, "error": str(e)}
+
+            # Independent exchanges - query them all at once, keep input order
+            with ThreadPoolExecutor(max_workers=min(8, len(exchanges_list))) as pool:
+                rows = list(pool.map(_top_of_book, exchanges_list))
 
             # Find best prices
             bids = [r["bid"] for r in rows if r.get("bid")]
@@ -873,7 +1136,7 @@ def use_ccxt(
                 "status": "success",
                 "content": [
                     {
-                        "text": json.dumps(
+                        "text": _dumps(
                             {
                                 "symbol": symbol,
                                 "exchanges": rows,
@@ -890,11 +1153,10 @@ def use_ccxt(
                                 and best_ask
                                 and best_bid > best_ask,
                             },
-                            indent=2,
                         )
                     }
                 ],
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === WEBSOCKET: WATCH_* ===
@@ -913,10 +1175,10 @@ def use_ccxt(
 
                     fn = getattr(ex, ws_method)
                     messages = []
-                    started = time.time()
+                    started = time.monotonic()
 
                     for _ in range(max_messages):
-                        if time.time() - started > max_seconds:
+                        if time.monotonic() - started > max_seconds:
                             break
 
                         # Build args based on method
@@ -947,16 +1209,16 @@ def use_ccxt(
             if not result.get("ok"):
                 return {
                     "status": "error",
-                    "content": [{"text": json.dumps(result, indent=2)}],
-                    "ms": int((time.time() - t0) * 1000),
+                    "content": [{"text": _dumps(result)}],
+                    "ms": _elapsed_ms(t0),
                 }
 
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(result, indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(result)}],
                 "exchange": exchange_id,
                 "method": ws_method,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === GENERIC: CALL ===
@@ -965,7 +1227,7 @@ def use_ccxt(
                 raise ValueError("method required for action='call'")
 
             exchange_id = _resolve_exchange_id(exchange)
-            ex = _build_exchange(exchange_id, _parse_json(config))
+            ex = _get_exchange(exchange_id, _parse_json(config))
 
             parsed_args = _parse_json(args, [])
             parsed_kwargs = _parse_json(kwargs, {})
@@ -983,17 +1245,12 @@ def use_ccxt(
             fn = getattr(ex, method)
             result = fn(*parsed_args, **parsed_kwargs)
 
-            try:
-                ex.close()
-            except:
-                pass
-
             return {
                 "status": "success",
-                "content": [{"text": json.dumps(_redact(result), indent=2)[:12000]}],
+                "content": [{"text": _dumps_capped(_redact(result))}],
                 "exchange": exchange_id,
                 "method": method,
-                "ms": int((time.time() - t0) * 1000),
+                "ms": _elapsed_ms(t0),
             }
 
         # === UNKNOWN ACTION ===
@@ -1004,23 +1261,31 @@ def use_ccxt(
                     "text": f"Unknown action: {action}. Valid actions: "
                     "list_exchanges, describe, list_methods, load_markets, "
                     "fetch_ticker, fetch_tickers, fetch_orderbook, fetch_ohlcv, fetch_trades, "
-                    "create_order, cancel_order, fetch_order, fetch_orders, fetch_open_orders, fetch_closed_orders, "
+                    "create_order, create_orders, cancel_order, fetch_order, fetch_orders, fetch_open_orders, fetch_closed_orders, "
                     "fetch_balance, fetch_positions, fetch_my_trades, "
-                    "multi_orderbook, watch_*, call"
+                    "multi_ohlcv, multi_orderbook, watch_*, call"
                 }
             ],
-            "ms": int((time.time() - t0) * 1000),
+            "ms": _elapsed_ms(t0),
         }
 
     except Exception as e:
+        text = f"{type(e).__name__}: {e}"
+        sig = (type(e).__name__, str(e)[:80])
+        if sig not in _seen_errors:
+            if len(_seen_errors) >= _SEEN_ERRORS_MAX:
+                _seen_errors.clear()
+            _seen_errors.add(sig)
+            text += f"\n\n{traceback.format_exc()}"
         return {
             "status": "error",
-            "content": [
-                {"text": f"{type(e).__name__}: {e}\n\n{traceback.format_exc()}"}
-            ],
-            "ms": int((time.time() - t0) * 1000),
+            "content": [{"text": text}],
+            "ms": _elapsed_ms(t0),
         }
 
+    finally:
+        _release_held()
+
 
 if __name__ == "__main__":
     # Test